@@ -0,0 +1,66 @@
+import time
+from collections import Counter
+from aiohttp import web
+import constants
+
+BOT_USER = {
+    "id": 1000000001,
+    "is_bot": True,
+    "first_name": "Samsara Notifier Bench",
+    "username": "samsara_notifier_bench_bot"
+}
+
+
+class FakeTelegramServer:
+    """Local stand-in for api.telegram.org, answers every Bot API method the handlers call."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.calls = Counter()
+        # Handlers swallow their exceptions and reply with ERROR_MESSAGE, this is the only trace of a failure
+        self.error_replies = 0
+        self.message_id = 0
+        self.runner = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self.handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        # port=0 lets the OS pick a free port, read back the real one
+        self.port = self.runner.addresses[0][1]
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+
+    async def handle(self, request: web.Request):
+        method = request.match_info["method"]
+        self.calls[method] += 1
+        data = await request.post()
+
+        if method == "getMe":
+            return web.json_response({"ok": True, "result": BOT_USER})
+
+        if method.startswith("send"):
+            self.message_id += 1
+            chat_id = int(data.get("chat_id", 0))
+            if method == "sendMessage" and data.get("text") == constants.ERROR_MESSAGE:
+                self.error_replies += 1
+            result = {
+                "message_id": self.message_id,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "from": BOT_USER,
+                "text": data.get("text", "")
+            }
+            return web.json_response({"ok": True, "result": result})
+
+        return web.json_response({"ok": True, "result": True})
@@ -0,0 +1,404 @@
+"""
+Offline load test for the bot.
+
+Boots the `dp` from main.py against a local fake Telegram Bot API and a throwaway
+Postgres database, replays synthetic traffic (admin FSM flows, user menu taps,
+strangers hitting /start) and reports throughput, update latency, DB connections
+opened and memory.
+
+    cd src
+    python -m benchmarks.load_test --companies 20 --users 200 --taps 10
+
+Without --pg-host a temporary cluster is created with initdb/pg_ctl, so both must
+be on PATH. With --pg-host a `samsara_bench_<pid>` database is created on that
+server and dropped afterwards; the bot's own database is never touched.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import resource
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import asyncpg
+from aiogram.dispatcher.event.bases import UNHANDLED
+from benchmarks.fake_telegram import FakeTelegramServer
+import constants
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCHEMA_SCRIPTS = ["002 CREATE TABLE company.sql", "003 CREATE TABLE sys_user.sql"]
+FAKE_TOKEN = "123456789:AAbenchmarkbenchmarkbenchmarkbench1"
+ADMIN_ID = 1
+USER_ID_BASE = 100000
+STRANGER_ID_BASE = 900000
+# Only user menu buttons that have a handler, the notification buttons are not implemented yet
+USER_TAPS = [
+    "/start",
+    "⬅️ Cancel",
+]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TempPostgres:
+    """Disposable Postgres cluster living in a temp directory."""
+
+    def __init__(self):
+        self.dir = None
+        self.port = free_port()
+
+    @property
+    def data_dir(self) -> str:
+        return os.path.join(self.dir, "data")
+
+    def start(self):
+        if not shutil.which("initdb") or not shutil.which("pg_ctl"):
+            raise RuntimeError("initdb/pg_ctl not found on PATH, pass --pg-host to use an existing server")
+
+        self.dir = tempfile.mkdtemp(prefix="samsara_bench_pg_")
+        subprocess.run(
+            ["initdb", "-D", self.data_dir, "-U", "postgres", "--auth=trust"],
+            check=True, stdout=subprocess.DEVNULL
+        )
+        subprocess.run(
+            [
+                "pg_ctl", "-D", self.data_dir, "-l", os.path.join(self.dir, "postgres.log"), "-w",
+                "-o", f"-p {self.port} -k {self.dir} -c listen_addresses=127.0.0.1",
+                "start"
+            ],
+            check=True, stdout=subprocess.DEVNULL
+        )
+
+    def stop(self):
+        if not self.dir:
+            return
+        subprocess.run(["pg_ctl", "-D", self.data_dir, "-m", "fast", "-w", "stop"], stdout=subprocess.DEVNULL)
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def server_config(self) -> dict:
+        return {"user": "postgres", "password": None, "host": "127.0.0.1", "port": self.port}
+
+
+async def create_database(server: dict, name: str):
+    conn = await asyncpg.connect(database="postgres", **server)
+    try:
+        await conn.execute(f'DROP DATABASE IF EXISTS "{name}"')
+        await conn.execute(f'CREATE DATABASE "{name}"')
+    finally:
+        await conn.close()
+
+    conn = await asyncpg.connect(database=name, **server)
+    try:
+        for script in SCHEMA_SCRIPTS:
+            with open(os.path.join(SRC_DIR, "scripts", script), encoding="utf-8") as f:
+                await conn.execute(f.read())
+    finally:
+        await conn.close()
+
+
+async def verify_seed(server: dict, name: str, companies: int, users: int):
+    """Aborts the run when seeding silently failed, otherwise traffic would only hit the "no such user" paths."""
+    conn = await asyncpg.connect(database=name, **server)
+    try:
+        company_count = await conn.fetchval(f"SELECT count(*) FROM {constants.COMPANY_TABLE}")
+        user_count = await conn.fetchval(f"SELECT count(*) FROM {constants.USER_TABLE}")
+    finally:
+        await conn.close()
+
+    if company_count != companies or user_count != users:
+        raise RuntimeError(
+            f"Seeding failed: expected {companies} companies and {users} users, "
+            f"found {company_count} and {user_count}"
+        )
+
+
+async def drop_database(server: dict, name: str):
+    conn = await asyncpg.connect(database="postgres", **server)
+    try:
+        await conn.execute(f'DROP DATABASE IF EXISTS "{name}"')
+    finally:
+        await conn.close()
+
+
+def load_app(db_config: dict, log_file: str, log_level: str | None = None):
+    """Imports main.py with config pointed at the benchmark database and fake admin."""
+    os.environ.setdefault("DB_PORT", str(db_config["port"]))
+    os.environ.setdefault("ADMIN", str(ADMIN_ID))
+
+    # Patch after import, load_dotenv(override=True) may have pulled real values from .env
+    import config
+    config.BOT_TOKEN = FAKE_TOKEN
+    config.DB_CONFIG = db_config
+    config.ADMIN_ID = ADMIN_ID
+    # The LOG_* overrides only apply because `import main` below is the first import of logger
+    if log_level:
+        config.LOG_LEVEL = log_level.upper()
+    config.LOG_FILE = log_file
+
+    import db
+    import main
+    import logger
+
+    # Keep production's logging cost (formatting, file writes) but don't flood the terminal
+    logger.stream_handler.setStream(open(os.devnull, "w"))
+    return main.dp, db, config.LOG_LEVEL
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = []
+        # Exceptions escaping the dispatcher plus ERROR_MESSAGE replies seen by the fake Bot API
+        self.errors = 0
+        self.unhandled = 0
+        self.started = 0.0
+        self.finished = 0.0
+
+    def report(self) -> dict:
+        seconds = self.finished - self.started
+        latencies = sorted(self.latencies)
+        return {
+            "updates": len(latencies),
+            "errors": self.errors,
+            "unhandled": self.unhandled,
+            "seconds": round(seconds, 3),
+            "updates_per_second": round(len(latencies) / seconds, 1) if seconds else 0.0,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        }
+
+
+def percentile(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    index = max(0, math.ceil(p / 100 * len(values)) - 1)
+    return values[index]
+
+
+class Replayer:
+    def __init__(self, dp, bot):
+        self.dp = dp
+        self.bot = bot
+        self.update_id = 0
+
+    def make_update(self, user_id: int, text: str) -> dict:
+        self.update_id += 1
+        return {
+            "update_id": self.update_id,
+            "message": {
+                "message_id": self.update_id,
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "from": {"id": user_id, "is_bot": False, "first_name": f"bench{user_id}"},
+                "text": text
+            }
+        }
+
+    async def send(self, stats: Stats, user_id: int, text: str):
+        update = self.make_update(user_id, text)
+        start = time.perf_counter()
+        try:
+            if await self.dp.feed_raw_update(self.bot, update) is UNHANDLED:
+                stats.unhandled += 1
+        except Exception:
+            stats.errors += 1
+        stats.latencies.append(time.perf_counter() - start)
+
+    async def session(self, stats: Stats, user_id: int, texts: list[str], semaphore: asyncio.Semaphore):
+        async with semaphore:
+            for text in texts:
+                await self.send(stats, user_id, text)
+
+
+def seed_script(companies: int, users: int) -> list[str]:
+    texts = []
+    for i in range(1, companies + 1):
+        texts += ["➕ Add company", f"Bench company {i}", f"bench-api-key-{i}"]
+    for j in range(users):
+        company_id = j % companies + 1
+        texts += ["➕ Add user", str(USER_ID_BASE + j), f"Bench user {j}", str(company_id)]
+    return texts
+
+
+def admin_script(rng: random.Random, companies: int) -> list[str]:
+    company_id = rng.randint(1, companies)
+    return [
+        "🏢 All companies",
+        "👥 All users",
+        "✏️ Edit company", str(company_id), f"Bench company {company_id}", f"bench-api-key-{company_id}",
+        "➕ Add company", "⬅️ Cancel",
+    ]
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    if args.trace_memory:
+        tracemalloc.start()
+
+    pg = None
+    if args.pg_host:
+        server = {"user": args.pg_user, "password": args.pg_password, "host": args.pg_host, "port": args.pg_port}
+    else:
+        pg = TempPostgres()
+        server = pg.server_config()
+
+    db_name = f"samsara_bench_{os.getpid()}"
+    db_created = False
+    log_dir = tempfile.mkdtemp(prefix="samsara_bench_log_")
+    telegram = FakeTelegramServer()
+
+    try:
+        if pg:
+            pg.start()
+        await create_database(server, db_name)
+        db_created = True
+        await telegram.start()
+
+        dp, db, log_level = load_app({**server, "database": db_name}, os.path.join(log_dir, "bot.log"), args.log_level)
+
+        from aiogram import Bot
+        from aiogram.client.session.aiohttp import AiohttpSession
+        from aiogram.client.telegram import TelegramAPIServer
+
+        connections = 0
+        get_db_connection = db.get_db_connection
+
+        async def counting_get_db_connection():
+            nonlocal connections
+            connections += 1
+            return await get_db_connection()
+
+        db.get_db_connection = counting_get_db_connection
+
+        session = AiohttpSession(api=TelegramAPIServer.from_base(telegram.base_url))
+        bot = Bot(token=FAKE_TOKEN, session=session)
+        replayer = Replayer(dp, bot)
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        try:
+            # Seeding goes through the admin FSM flows one message at a time, like a real admin
+            seed = Stats()
+            seed.started = time.perf_counter()
+            for text in seed_script(args.companies, args.users):
+                await replayer.send(seed, ADMIN_ID, text)
+            seed.finished = time.perf_counter()
+            seed.errors += telegram.error_replies
+            await verify_seed(server, db_name, args.companies, args.users)
+
+            admin_texts = []
+            for _ in range(args.admin_sessions):
+                admin_texts += admin_script(rng, args.companies)
+            sessions = [(ADMIN_ID, admin_texts)]
+            for j in range(args.users):
+                sessions.append((USER_ID_BASE + j, [rng.choice(USER_TAPS) for _ in range(args.taps)]))
+            for k in range(args.strangers):
+                sessions.append((STRANGER_ID_BASE + k, ["/start"]))
+            rng.shuffle(sessions)
+
+            connections_after_seed = connections
+            error_replies_after_seed = telegram.error_replies
+            traffic_stats = Stats()
+            traffic_stats.started = time.perf_counter()
+            await asyncio.gather(*(
+                replayer.session(traffic_stats, user_id, texts, semaphore)
+                for user_id, texts in sessions
+            ))
+            traffic_stats.finished = time.perf_counter()
+            traffic_stats.errors += telegram.error_replies - error_replies_after_seed
+        finally:
+            await bot.session.close()
+            db.get_db_connection = get_db_connection
+
+        result = {
+            "params": {**{k: v for k, v in vars(args).items() if k != "pg_password"}, "log_level": log_level},
+            "seed": seed.report(),
+            "traffic": traffic_stats.report(),
+            "db_connections": {
+                "seed": connections_after_seed,
+                "traffic": connections - connections_after_seed,
+                "total": connections,
+            },
+            "bot_api_calls": dict(telegram.calls),
+            "max_rss_mib": round(max_rss_mib(), 1),
+        }
+        if args.trace_memory:
+            result["tracemalloc_peak_mib"] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1)
+        return result
+    finally:
+        await telegram.stop()
+        try:
+            if db_created:
+                await drop_database(server, db_name)
+        finally:
+            if pg:
+                pg.stop()
+            shutil.rmtree(log_dir, ignore_errors=True)
+
+
+def max_rss_mib() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+
+
+def print_report(result: dict):
+    print(f"{'phase':<10}{'updates':>9}{'errors':>8}{'unhandled':>11}{'seconds':>10}{'upd/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for phase in ("seed", "traffic"):
+        r = result[phase]
+        print(
+            f"{phase:<10}{r['updates']:>9}{r['errors']:>8}{r['unhandled']:>11}{r['seconds']:>10}{r['updates_per_second']:>10}"
+            f"{r['p50_ms']:>10}{r['p99_ms']:>10}{r['max_ms']:>10}"
+        )
+    connections = result["db_connections"]
+    print(f"\nDB connections opened: {connections['total']} (seed {connections['seed']}, traffic {connections['traffic']})")
+    print("Bot API calls: " + ", ".join(f"{k}={v}" for k, v in sorted(result["bot_api_calls"].items())))
+    print(f"Max RSS: {result['max_rss_mib']} MiB")
+    if "tracemalloc_peak_mib" in result:
+        print(f"tracemalloc peak: {result['tracemalloc_peak_mib']} MiB")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline load test for the Samsara notifier bot")
+    parser.add_argument("--companies", type=int, default=10)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--taps", type=int, default=10, help="menu taps per user")
+    parser.add_argument("--admin-sessions", type=int, default=5)
+    parser.add_argument("--strangers", type=int, default=20, help="unknown users sending /start")
+    parser.add_argument("--concurrency", type=int, default=50, help="user sessions running at once")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace-memory", action="store_true", help="report tracemalloc peak (slows the run)")
+    parser.add_argument("--json", help="also write the report to this file")
+    parser.add_argument("--log-level", help="override the configured LOG_LEVEL for the bot")
+    parser.add_argument("--pg-host")
+    parser.add_argument("--pg-port", type=int, default=5432)
+    parser.add_argument("--pg-user", default="postgres")
+    parser.add_argument("--pg-password")
+    args = parser.parse_args()
+    if args.companies < 1:
+        parser.error("--companies must be at least 1")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    for name in ("users", "taps", "strangers", "admin_sessions"):
+        if getattr(args, name) < 0:
+            parser.error(f"--{name.replace('_', '-')} must not be negative")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    result = asyncio.run(run(args))
+    print_report(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
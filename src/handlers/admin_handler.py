@@ -3,7 +3,7 @@ from aiogram.fsm.state import State, StatesGroup
 from aiogram import F, Router
 from functions import *
 from aiogram.types import *
-from logger import logger
+from logger import logger, set_log_context
 import keyboards
 import constants
 from models import Company, User
@@ -53,7 +53,8 @@ async def save_company(message: Message, state: FSMContext):
             name=data['full_name'],
             api_key=data['api_key']
         )
-        await company_service.create(company)
+        company_id = await company_service.create(company)
+        set_log_context(company_id=company_id)
         await message.answer("✅ Company added succesfully", reply_markup=keyboards.admin_menu)
     except Exception as e:
         logger.error(f"Error while saving company: {e}")
@@ -103,7 +104,9 @@ async def edit_company(message: Message, state: FSMContext):
 @router.message(EditCompanyStates.id)
 async def ask_new_name(message: Message, state: FSMContext):
     try:
-        await state.update_data(id=int(message.text.strip()))
+        company_id = int(message.text.strip())
+        set_log_context(company_id=company_id)
+        await state.update_data(id=company_id)
         await state.set_state(EditCompanyStates.name)
         await message.answer("Enter company's (new) name: ", reply_markup=keyboards.cancel_button)
 
@@ -114,7 +117,8 @@ async def ask_new_name(message: Message, state: FSMContext):
 @router.message(EditCompanyStates.name)
 async def ask_new_api_key(message: Message, state: FSMContext):
     try:
-        await state.update_data(name=message.text.strip())
+        data = await state.update_data(name=message.text.strip())
+        set_log_context(company_id=data.get('id'))
         await state.set_state(EditCompanyStates.api_key)
         await message.answer("Enter (new) api-key: ", reply_markup=keyboards.cancel_button)
 
@@ -127,6 +131,7 @@ async def ask_new_api_key(message: Message, state: FSMContext):
     try:
         await state.update_data(api_key=message.text.strip())
         data = await state.get_data()
+        set_log_context(company_id=data.get('id'))
         await state.clear()
 
         company = Company(
@@ -162,6 +167,7 @@ async def delete_company(message: Message, state: FSMContext):
 async def delete_company_by_id(message: Message, state: FSMContext):
     try:
         company_id = int(message.text.strip())
+        set_log_context(company_id=company_id)
         await company_service.delete_by_id(company_id)
         await state.clear()
         await message.answer("✅ Company deleted successfully", reply_markup=keyboards.admin_menu)
@@ -215,6 +221,7 @@ async def ask_company_id(message: Message, state: FSMContext):
 async def save_user(message: Message, state: FSMContext):
     try:
         company_id = int(message.text.strip())
+        set_log_context(company_id=company_id)
         data = await state.get_data()
         await state.clear()
 
@@ -306,6 +313,7 @@ async def ask_new_company_id(message: Message, state: FSMContext):
 async def save_updated_user(message: Message, state: FSMContext):
     try:
         company_id = int(message.text.strip())
+        set_log_context(company_id=company_id)
         data = await state.get_data()
         await state.clear()
 
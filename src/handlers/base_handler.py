@@ -1,7 +1,7 @@
 from aiogram import Router, F
 from aiogram.types import *
 from services import user_service
-from logger import logger
+from logger import logger, set_log_context
 import constants
 import keyboards
 from functions import *
@@ -23,6 +23,7 @@ async def cancel(message: Message, state: FSMContext):
         
         user = await user_service.get_by_id(user_id, constants.TELEGRAM_ID)
         if user:
+            set_log_context(company_id=user.company_id)
             await message.answer("✅ Cancelled", reply_markup=keyboards.user_menu)
             return
         
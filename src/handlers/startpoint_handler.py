@@ -2,7 +2,7 @@ from aiogram import Router, F
 from aiogram.types import *
 from aiogram.filters import Command
 from services import user_service
-from logger import logger
+from logger import logger, set_log_context
 import constants
 import functions as fn
 import keyboards
@@ -23,6 +23,7 @@ async def welcome(message: Message):
             await message.answer("You have no access for using this bot!", reply_markup=ReplyKeyboardRemove())
             return
 
+        set_log_context(company_id=user.company_id)
         await message.answer("👋 Hi.\n\nWelcome to our bot", reply_markup=keyboards.user_menu)
 
 
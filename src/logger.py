@@ -1,13 +1,106 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
+import random
+from contextvars import ContextVar
+import config
+
+# Per-update context, filled by middlewares.LogContextMiddleware and the handlers
+update_id_var: ContextVar[int | None] = ContextVar("update_id", default=None)
+telegram_id_var: ContextVar[int | None] = ContextVar("telegram_id", default=None)
+company_id_var: ContextVar[int | None] = ContextVar("company_id", default=None)
+
+CONTEXT_FIELDS = {
+    "update_id": update_id_var,
+    "telegram_id": telegram_id_var,
+    "company_id": company_id_var,
+}
+
+
+def set_log_context(**values):
+    for name, value in values.items():
+        CONTEXT_FIELDS[name].set(value)
+
+
+class ContextFilter(logging.Filter):
+    """Copies the context vars onto the record before it leaves the event loop thread."""
+
+    def filter(self, record):
+        for name, var in CONTEXT_FIELDS.items():
+            setattr(record, name, var.get())
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Keeps only a fraction of DEBUG records, everything above DEBUG always passes."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.rate >= 1:
+            return True
+        return random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name in CONTEXT_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                payload[name] = value
+        return json.dumps(payload, ensure_ascii=False)
+
+
+def _build_file_handler() -> logging.Handler:
+    if config.LOG_ROTATION == "time":
+        return logging.handlers.TimedRotatingFileHandler(
+            config.LOG_FILE,
+            when=config.LOG_ROTATE_WHEN,
+            backupCount=config.LOG_BACKUP_COUNT,
+            encoding="utf-8"
+        )
+    return logging.handlers.RotatingFileHandler(
+        config.LOG_FILE,
+        maxBytes=config.LOG_MAX_BYTES,
+        backupCount=config.LOG_BACKUP_COUNT,
+        encoding="utf-8"
+    )
+
+
+if config.LOG_FORMAT == "json":
+    formatter = JsonFormatter()
+else:
+    formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+
+file_handler = _build_file_handler()
+stream_handler = logging.StreamHandler()
+for handler in (file_handler, stream_handler):
+    handler.setFormatter(formatter)
+
+# The event loop only puts records on the queue, disk and console writes happen on the listener thread
+log_queue = queue.SimpleQueue()
+queue_handler = logging.handlers.QueueHandler(log_queue)
+queue_handler.setFormatter(logging.Formatter("%(message)s"))
+queue_handler.addFilter(DebugSamplingFilter(config.LOG_DEBUG_SAMPLE_RATE))
+queue_handler.addFilter(ContextFilter())
+
+listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+listener.start()
+atexit.register(listener.stop)
 
 logging.basicConfig(
-    level=logging.INFO, 
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler("bot.log"),  
-        logging.StreamHandler()  
-    ]
+    level=config.LOG_LEVEL,
+    handlers=[queue_handler]
 )
 
 logger = logging.getLogger(__name__)
-
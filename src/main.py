@@ -4,6 +4,9 @@ import asyncio
 from handlers.startpoint_handler import router as startpoint_router
 from handlers.base_handler import router as base_router
 from handlers.admin_handler import router as admin_router
+from middlewares import LogContextMiddleware
+
+dp.update.outer_middleware(LogContextMiddleware())
 
 dp.include_router(startpoint_router)
 dp.include_router(base_router)
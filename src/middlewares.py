@@ -0,0 +1,20 @@
+from typing import Any, Awaitable, Callable
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+from logger import set_log_context
+
+
+class LogContextMiddleware(BaseMiddleware):
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any]
+    ) -> Any:
+        user = data.get("event_from_user")
+        set_log_context(
+            update_id=event.update_id if isinstance(event, Update) else None,
+            telegram_id=user.id if user else None,
+            company_id=None
+        )
+        return await handler(event, data)
@@ -48,16 +48,17 @@ async def get_by_id(id: int, id_column: str | None = "id"):
 
 async def create(company: Company):
     conn = await db.get_db_connection()
-    query = f"INSERT INTO {constants.COMPANY_TABLE}(name, api_key) VALUES ($1, $2)"
+    query = f"INSERT INTO {constants.COMPANY_TABLE}(name, api_key) VALUES ($1, $2) RETURNING id"
 
     try:
-        await conn.execute(
+        return await conn.fetchval(
             query,
             company.name,
             company.api_key
         )
     except Exception as ex:
         logger.error(f"Eror with creating company: {ex}")
+        return None
     finally:
         await conn.close()  
 